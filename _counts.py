@@ -0,0 +1,76 @@
+"""
+Numba-compiled counting kernel for aggregate_records.
+
+This module is an optional fast path: importing it requires numpy and
+numba. data_processor guards the import and falls back to pandas or the
+pure-Python loop when they are not installed.
+"""
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+
+@njit(cache=True)
+def tally(uid, sbit, fbit, hid, nu, nh):
+    """
+    Scatter-add per-user and per-hour counts.
+
+    uid/sbit/fbit/hid are parallel arrays: user id, 1 if the record
+    succeeded, 1 if its status is exactly "fail", and hour-bucket id
+    (-1 for records without a timestamp). nu and nh are the number of
+    distinct users and hour buckets. The hourly failure count uses the
+    fail bit, not not-success, to match the pure-Python path for
+    statuses outside {"success", "fail"}.
+    """
+    total = np.zeros(nu, np.int64)
+    succ = np.zeros(nu, np.int64)
+    hb_total = np.zeros(nh, np.int64)
+    hb_fail = np.zeros(nh, np.int64)
+
+    for i in range(uid.size):
+        u = uid[i]
+        total[u] += 1
+        succ[u] += sbit[i]
+
+        h = hid[i]
+        if h >= 0:
+            hb_total[h] += 1
+            hb_fail[h] += fbit[i]
+
+    return total, succ, hb_total, hb_fail
+
+
+@njit(cache=True, parallel=True)
+def tally_par(uid, sbit, fbit, hid, nu, nh):
+    """
+    Parallel tally: each thread scatter-adds its shard of the record
+    range into thread-local count rows, which are then reduced. Same
+    results and signature as tally.
+    """
+    nthreads = get_num_threads()
+    total = np.zeros((nthreads, nu), np.int64)
+    succ = np.zeros((nthreads, nu), np.int64)
+    hb_total = np.zeros((nthreads, nh), np.int64)
+    hb_fail = np.zeros((nthreads, nh), np.int64)
+
+    n = uid.size
+    chunk = (n + nthreads - 1) // nthreads
+
+    for t in prange(nthreads):
+        start = t * chunk
+        end = min(start + chunk, n)
+        for i in range(start, end):
+            u = uid[i]
+            total[t, u] += 1
+            succ[t, u] += sbit[i]
+
+            h = hid[i]
+            if h >= 0:
+                hb_total[t, h] += 1
+                hb_fail[t, h] += fbit[i]
+
+    return (
+        total.sum(axis=0),
+        succ.sum(axis=0),
+        hb_total.sum(axis=0),
+        hb_fail.sum(axis=0),
+    )
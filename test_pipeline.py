@@ -1,20 +1,51 @@
-from data_processor_v1 import (
-    load_json,
-    aggregate_records,
-    build_output,
-    filter_users,
-    build_stats,
-)
-
-def test_stats_match_filtered_output():
-    # Arranga
-    records = load_json("test_data.json")
-
-    # Act (pipeline order)
-    summary = aggregate_records(records)
-    output = build_output(summary)
-    filtered = filter_users(output, only_failures=True)
-    stats = build_stats(filtered)
-
-    # Assert (the invariant)
-    assert stats["total_users"] == len(filtered["users"])
\ No newline at end of file
+import data_processor as dp
+from data_processor import (
+    load_json,
+    aggregate_records,
+    build_output,
+    filter_users,
+    build_stats,
+)
+
+def test_stats_match_filtered_output():
+    # Arranga
+    records = load_json("test_data.json")
+
+    # Act (pipeline order)
+    summary = aggregate_records(records)
+    output = build_output(summary)
+    filtered = filter_users(output, only_failures=True)
+    stats = build_stats(filtered)
+
+    # Assert (the invariant)
+    assert stats["total_users"] == len(filtered["users"])
+
+def test_vectorized_paths_match_pure():
+    # Exercise the spots where the backends can silently diverge:
+    # a status outside {"success", "fail"}, a date-only timestamp,
+    # and a record with no timestamp at all.
+    records = [
+        {"user": "alice", "event": "login", "status": "success",
+         "timestamp": "2023-12-25T10:00:00"},
+        {"user": "alice", "event": "upload", "status": "fail",
+         "timestamp": "2023-12-25T10:15:00"},
+        {"user": "bob", "event": "login", "status": "timeout",
+         "timestamp": "2023-12-25T11:00:00"},
+        {"user": "bob", "event": "login", "status": "fail",
+         "timestamp": "2024-01-01"},
+        {"user": "carol", "event": "sync", "status": "success"},
+    ] * 3
+
+    # Small input always takes the pure-Python loop.
+    expected = aggregate_records(records)
+
+    if dp.np is None or (dp.tally is None and dp.pd is None):
+        return  # no vectorized backend installed
+
+    columns = dp._to_columns(records)
+
+    if dp.tally is not None:
+        assert dp._aggregate_numba(*columns) == expected
+
+    if dp.pd is not None:
+        assert dp._aggregate_pandas(*columns) == expected